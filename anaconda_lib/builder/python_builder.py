@@ -7,18 +7,23 @@ from string import Template
 
 import sublime
 
-from ..helpers import get_settings, active_view, is_remote_session
+from ..helpers import get_settings, is_remote_session
 
 
 class AnacondaSetPythonBuilder(object):
     """Sets or modifies the builder of the current project
     """
 
+    def __init__(self, window=None):
+        if window is None:
+            window = sublime.active_window()
+        self.window = window
+
     def update_interpreter_build_system(self, cmd):
         """Updates the project and adds/modifies the build system
         """
 
-        view = active_view()
+        view = self.window.active_view()
         if get_settings(view, 'auto_python_builder_enabled', True) is False:
             return
 
@@ -60,7 +65,7 @@ class AnacondaSetPythonBuilder(object):
         """Get Project configuration
         """
 
-        return sublime.active_window().project_data()
+        return self.window.project_data()
 
     def _parse_tpl(self, cmd):
         """Parses the builder template
@@ -82,4 +87,4 @@ class AnacondaSetPythonBuilder(object):
         """Save project configuration
         """
 
-        sublime.active_window().set_project_data(project_data)
+        self.window.set_project_data(project_data)
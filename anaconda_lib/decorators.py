@@ -76,7 +76,9 @@ def auto_project_switch_ng(func):
         if self.status != WorkerStatus.healthy:
             return
 
-        view = sublime.active_window().active_view()
+        view = kwargs.get('view')
+        if view is None:
+            view = sublime.active_window().active_view()
         project_switch = get_settings(view, 'auto_project_switch', False)
         if project_switch:
             python_interpreter = get_settings(view, 'python_interpreter')
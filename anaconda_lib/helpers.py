@@ -442,4 +442,4 @@ def debug_enabled(view):
     """Returns True if the debug is enable
     """
 
-    return get_settings(active_view(), 'jsonserver_debug', False) is True
+    return get_settings(view, 'jsonserver_debug', False) is True
@@ -106,6 +106,9 @@ class EventHandler(object):
         self.sock = sock
         if sock is None:
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            # small JSON frames, don't let Nagle's algorithm delay them
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
 
         self.sock.connect(address)
         self.connected = True
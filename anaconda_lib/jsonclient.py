@@ -6,7 +6,6 @@
 """Minimalist standard library Asynchronous JSON Client
 """
 
-import sys
 import uuid
 import socket
 import logging
@@ -26,9 +25,8 @@ from .callback import Callback
 from .ioloop import EventHandler
 from ._typing import Callable, Any
 
-logger = logging.getLogger(__name__)
-logger.addHandler(logging.StreamHandler(sys.stdout))
-logger.setLevel(logging.DEBUG)
+# messages propagate to the anacondaST3 logger configured in logger.py
+logger = logging.getLogger('anacondaST3.jsonclient')
 
 
 class AsynClient(EventHandler):
@@ -103,9 +101,10 @@ class AsynClient(EventHandler):
         try:
             callback(data)
         except Exception as error:
-            logging.error(error)
-            for traceback_line in traceback.format_exc().splitlines():
-                logging.error(traceback_line)
+            if logger.isEnabledFor(logging.ERROR):
+                logger.error(error)
+                for traceback_line in traceback.format_exc().splitlines():
+                    logger.error(traceback_line)
 
     def send_command(self, callback: Callable, **data: Any) -> None:
         """Send the given command that should be handled bu the given callback
@@ -51,12 +51,13 @@ class MetaLog(type):
 
         cls._logger = logging.getLogger('anacondaST3')
         cls._logger.setLevel(logging.__getattribute__(log_level.upper()))
-        log_handler = logging.StreamHandler(sys.stdout)
-        log_handler.setFormatter(logging.Formatter(
-            '%(name)s: %(levelname)s - %(message)s'
-        ))
-
-        cls._logger.addHandler(log_handler)
+        if not cls._logger.handlers:
+            # the logger survives plugin reloads, don't add it twice
+            log_handler = logging.StreamHandler(sys.stdout)
+            log_handler.setFormatter(logging.Formatter(
+                '%(name)s: %(levelname)s - %(message)s'
+            ))
+            cls._logger.addHandler(log_handler)
         cls._logger.propagate = False
 
         obj = super().__new__(cls, name, bases, attrs)
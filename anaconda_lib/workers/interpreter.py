@@ -3,6 +3,7 @@
 # This program is Free Software see LICENSE file for details
 
 import os
+import time
 import socket
 
 from urllib.parse import urlparse, parse_qs
@@ -12,9 +13,82 @@ import sublime
 from ..logger import Log
 from ..unix_socket import UnixSocketPath
 from ..helpers import project_name, debug_enabled
-from ..helpers import get_settings, active_view, get_interpreter
+from ..helpers import get_settings
 from ..vagrant import VagrantIPAddressGlobal, VagrantMachineGlobalInfo
 
+# these never change during the plugin host process lifetime
+_JSONSERVER_SCRIPT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    'anaconda_server', 'jsonserver.py'
+)
+_OWNER_PID = str(os.getpid())
+
+# seconds that the settings used to build a jsonserver are cached per window
+BUILD_SETTINGS_TTL = 5
+_SETTINGS_CACHE = {}
+_PATHS_CACHE = {}
+
+
+def _get_build_settings(window, view):
+    """Return the settings needed to build a local jsonserver command line
+
+    They are read in one pass and cached per window and view for
+    BUILD_SETTINGS_TTL seconds so restarts and reconnections do not traverse
+    them again. The python interpreter is never cached, it always comes from
+    the raw interpreter the Interpreter object has been built with
+    """
+
+    key = (window.id(), view.id() if view is not None else None)
+    checked, settings = _SETTINGS_CACHE.get(key, (None, None))
+    if checked is not None and time.monotonic() - checked < BUILD_SETTINGS_TTL:
+        return settings
+
+    settings = {
+        'extra_paths': get_settings(view, 'extra_paths', []),
+        'folders': window.folders()
+    }
+    _SETTINGS_CACHE[key] = (time.monotonic(), settings)
+    return settings
+
+
+def _join_paths(paths):
+    """Return the comma separated extra paths argument for the jsonserver
+    """
+
+    key = tuple(paths)
+    joined = _PATHS_CACHE.get(key)
+    if joined is None:
+        joined = _PATHS_CACHE.setdefault(key, ','.join(key))
+
+    return joined
+
+
+def _expand_paths(extra, folders):
+    """Return the list of paths to be added to jedi
+    """
+
+    if isinstance(extra, str):
+        extra = extra.split(',')
+
+    paths = [os.path.expanduser(os.path.expandvars(p)) for p in extra]
+    paths.extend(folders)
+    return paths
+
+
+def build_paths(window, view):
+    """Return the paths that a local interpreter built for the view would use
+    """
+
+    settings = _get_build_settings(window, view)
+    return _expand_paths(settings['extra_paths'], settings['folders'])
+
+
+def invalidate_build_settings():
+    """Forget every cached jsonserver build settings
+    """
+
+    _SETTINGS_CACHE.clear()
+
 
 class Interpreter(object):
     """Parses a configured Python Interpreter
@@ -36,6 +110,14 @@ class Interpreter(object):
     def raw_interpreter(self):
         return self.__raw_interpreter
 
+    @property
+    def key(self):
+        """Return a key that identifies interpreters that can share a worker
+        """
+
+        paths = tuple(self.paths or ())
+        return (self.raw_interpreter, self.project_name, paths)
+
     @property
     def for_local(self):
         """Returns True if this interpreter is configured for local
@@ -67,23 +149,37 @@ class Interpreter(object):
 
         return self.__project_name
 
-    def renew_interpreter(self):
+    def renew_interpreter(self, window=None, view=None):
         """Renew the whole intrepreter
         """
 
         if not self.for_local:
             return
 
-        self.__prepare_local_interpreter()
+        self.__prepare_local_interpreter(window, view)
+
+    def release_listen_socket(self):
+        """Return the pre-bound jsonserver listen socket (if any) and forget it
+
+        The caller is responsible of closing it once the jsonserver process
+        has inherited it
+        """
+
+        return self.__data.pop('listen_socket', None)
 
-    def __prepare_local_interpreter(self):
+    def __prepare_local_interpreter(self, window=None, view=None):
         """Prepare data for the local interpreter if scheme is lcoal
         """
 
-        view = active_view()
+        if window is None:
+            window = sublime.active_window()
+        if view is None:
+            view = window.active_view()
+        settings = _get_build_settings(window, view)
+        folders = settings['folders']
         self.__extract_port(view)
-        self.__extract_paths(view)
-        self.__extract_python_interpreter(view)
+        self.__extract_paths(settings['extra_paths'], folders)
+        self.__extract_python_interpreter(self.__raw_interpreter)
         self.__extract_script()
 
         args = [self.python, '-B', self.script_file, '-p', self.project_name]
@@ -91,11 +187,10 @@ class Interpreter(object):
             args.append(str(self.port))
         if len(self.paths) > 0:
             paths = [p for p in self.paths if os.path.exists(p)]
-            args.extend(['-e', ','.join(paths)])
-        args.extend([str(os.getpid())])
+            args.extend(['-e', _join_paths(paths)])
+        args.append(_OWNER_PID)
 
         kwargs = {}
-        folders = sublime.active_window().folders()
         if len(folders) > 0 and os.path.exists(folders[0]):
             kwargs['cwd'] = folders[0]
 
@@ -117,38 +212,44 @@ class Interpreter(object):
             return
 
         if sublime.platform() != 'linux':
+            s = self.release_listen_socket()
+            if s is not None:
+                s.close()
+
             s = socket.socket()
+            if os.name == 'posix':
+                # bind and listen only once, the jsonserver inherits it
+                s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                s.bind(('localhost', 0))
+                s.listen(5)
+                self.__data['listen_socket'] = s
+                self.__data['port'] = s.getsockname()[1]
+                return
+
             s.bind(('', 0))
             self.__data['port'] = s.getsockname()[1]
             s.close()
 
-    def __extract_paths(self, view):
+    def __extract_paths(self, extra, folders):
         """Extract a list of paths to be added to jedi
         """
 
-        extra = get_settings(view, 'extra_paths', [])
-        paths = [os.path.expanduser(os.path.expandvars(p)) for p in extra]
-
-        try:
-            paths.extend(sublime.active_window().folders())
-        except AttributeError:
+        if isinstance(extra, str):
             Log.warning(
                 'Your `extra_paths` configuration is a string but we are '
                 'expecting a list of strings.'
             )
-            paths = paths.split(',')
-            paths.extend(sublime.active_window().folder())
 
-        self.__data['paths'] = paths
+        self.__data['paths'] = _expand_paths(extra, folders)
 
-    def __extract_python_interpreter(self, view):
+    def __extract_python_interpreter(self, raw_python):
         """Extract the configured python interpreter
         """
 
         try:
             urldata = urlparse(
                 os.path.expanduser(
-                    os.path.expandvars(get_interpreter(view))
+                    os.path.expandvars(raw_python)
                 )
             )
             
@@ -173,10 +274,7 @@ class Interpreter(object):
         """Extrct the jsonserver.py script location
         """
 
-        self.__data['script_file'] = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-            'anaconda_server', 'jsonserver.py'
-        )
+        self.__data['script_file'] = _JSONSERVER_SCRIPT
 
     def __get_unix_domain_socket(self):
         """Compound the Unix domain socket path
@@ -3,10 +3,16 @@
 # This program is Free Software see LICENSE file for details
 
 import os
+import select
+import threading
+import subprocess
 
 from ..helpers import create_subprocess
 from ..helpers import debug_enabled, active_view
 
+# not defined in the subprocess module before Python 3.7
+CREATE_NO_WINDOW = 0x08000000
+
 
 class LocalProcess(object):
     """Starts a new local instance of the JsonServer
@@ -15,6 +21,8 @@ class LocalProcess(object):
     def __init__(self, interpreter):
         self.interpreter = interpreter
         self._process = None
+        self._ready_fd = None
+        self._alive = False
         self.error = ''
         self.tip = ''
 
@@ -27,7 +35,7 @@ class LocalProcess(object):
             # if debug is active, the process is hadnled manually
             return True
 
-        if self._process.poll() is not None:
+        if not self._alive:
             self.error = 'the jsonserver process is terminated'
             self.tip = 'check your operating system logs'
             return False
@@ -44,15 +52,82 @@ class LocalProcess(object):
             # if we are in debug mode the JsonServer is handled manually
             return True
 
+        # a previous start could have failed before anyone waited on it
+        self._close_ready_fd()
+
         args, kwargs = self.interpreter.arguments
+        ready_w = None
+        listen_sock = self.interpreter.release_listen_socket()
+        if os.name == 'posix':
+            # the jsonserver writes a byte into this pipe once it listens
+            self._ready_fd, ready_w = os.pipe()
+            args = args + ['-r', str(ready_w)]
+            pass_fds = (ready_w,)
+            if listen_sock is not None:
+                # the jsonserver will accept in our already bound socket
+                args.extend(['-f', str(listen_sock.fileno())])
+                pass_fds += (listen_sock.fileno(),)
+            # don't leak our descriptors and don't share our session
+            kwargs = dict(
+                kwargs, pass_fds=pass_fds,
+                close_fds=True, start_new_session=True
+            )
+        else:
+            kwargs = dict(kwargs, close_fds=True, creationflags=(
+                CREATE_NO_WINDOW | subprocess.CREATE_NEW_PROCESS_GROUP
+            ))
+
         self._process = create_subprocess(args, **kwargs)
+        if ready_w is not None:
+            os.close(ready_w)
+        if listen_sock is not None:
+            listen_sock.close()
+
         if self._process is None:
             # we can't spawn a new process for jsonserver, Wrong config?
+            self._close_ready_fd()
             self._set_wrong_config_error()
             return False
 
+        self._alive = True
+        threading.Thread(
+            target=self._wait_exit, args=(self._process,), daemon=True
+        ).start()
         return True
 
+    def wait_ready(self, timeout):
+        """Block until the jsonserver notifies that it is ready to accept
+
+        Returns None if there is no readiness pipe (debug mode, Windows) so
+        the caller has to poll, and False if the timeout expires or the
+        process closed the pipe without notifying us (self.error is set)
+        """
+
+        if self._ready_fd is None:
+            return None
+
+        try:
+            ready, _, _ = select.select([self._ready_fd], [], [], timeout)
+            if not ready:
+                self.error = (
+                    'the jsonserver process did not notify that it was '
+                    'ready after {} seconds'.format(timeout)
+                )
+                self.tip = 'check your operating system logs'
+                return False
+
+            if os.read(self._ready_fd, 1) != b'1':
+                self.error = (
+                    'the jsonserver process exited before it was ready '
+                    'to accept connections'
+                )
+                self.tip = 'check your operating system logs'
+                return False
+
+            return True
+        finally:
+            self._close_ready_fd()
+
     def stop(self):
         """Stop the current process
         """
@@ -61,6 +136,27 @@ class LocalProcess(object):
             self._process.kill()
             self._process = None
 
+        self._alive = False
+        self._close_ready_fd()
+
+    def _wait_exit(self, process):
+        """Wait for the given process to exit and flag it as not alive
+
+        This runs in its own thread so health checks don't need to poll
+        """
+
+        process.wait()
+        if process is self._process:
+            self._alive = False
+
+    def _close_ready_fd(self):
+        """Close our side of the readiness pipe if it is still open
+        """
+
+        if self._ready_fd is not None:
+            os.close(self._ready_fd)
+            self._ready_fd = None
+
     def _set_wrong_config_error(self):
         """Set the local error and tip for bad python interpreter configuration
         """
@@ -11,6 +11,7 @@ from ..logger import Log
 from .worker import Worker
 from ..helpers import project_name, get_socket_timeout
 from ..constants import WorkerStatus
+from .interpreter import invalidate_build_settings
 from ..builder.python_builder import AnacondaSetPythonBuilder
 
 
@@ -35,6 +36,17 @@ class LocalWorker(Worker):
         start = time.time()
         times = 1
         interval = timeout * 10
+        ready = self.process.wait_ready(interval)
+        if ready is False:
+            # it died or hung before listening, polling would not help
+            self.error = self.process.error
+            self.tip = self.process.tip
+            return False
+
+        if ready and self._status(timeout):
+            return True
+
+        # no readiness notification available, fallback to polling
         while not self._status(timeout):
             if time.time() - start >= interval:  # expressed in seconds
                 msg = '{}. tried to connect {} times during {} seconds'
@@ -45,15 +57,21 @@ class LocalWorker(Worker):
 
         return True
 
-    def start(self):
+    def start(self, window=None, view=None):
         """Start the worker
         """
 
-        self._update_python_builder()
+        if window is None:
+            window = sublime.active_window()
+        if view is None:
+            view = window.active_view()
+
+        self._update_python_builder(window)
         if self.reconnecting:
-            self.interpreter.renew_interpreter()
+            self.interpreter.renew_interpreter(window, view)
+            self.invalidate_address()
 
-        super(LocalWorker, self).start()
+        super(LocalWorker, self).start(window, view)
 
     def stop(self):
         """Stop it now please
@@ -61,6 +79,7 @@ class LocalWorker(Worker):
 
         self.process.stop()
         self.client.close()
+        invalidate_build_settings()
         self.status = WorkerStatus.incomplete
 
     def on_python_interpreter_switch(self, raw_python_interpreter):
@@ -88,13 +107,13 @@ class LocalWorker(Worker):
             self.reconnecting = True
             self.stop()
 
-    def _update_python_builder(self):
+    def _update_python_builder(self, window):
         """Update the python builder in the config file
         """
 
-        p_data = sublime.active_window().project_data()
+        p_data = window.project_data()
         if p_data is not None:
-            AnacondaSetPythonBuilder().update_interpreter_build_system(
+            AnacondaSetPythonBuilder(window).update_interpreter_build_system(
                 self.interpreter.python
             )
 
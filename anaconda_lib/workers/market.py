@@ -2,57 +2,93 @@
 # Copyright (C) 2013 - 2016 - Oscar Campos <oscar.campos@member.fsf.org>
 # This program is Free Software see LICENSE file for details
 
-import threading
-
 import sublime
 
 from ..info import Repr
 from ..logger import Log
 from ..constants import WorkerStatus
-from .interpreter import Interpreter
+from .interpreter import Interpreter, build_paths, invalidate_build_settings
 from .local_worker import LocalWorker
 from .remote_worker import RemoteWorker
 from .vagrant_worker import VagrantWorker
-from ..helpers import active_view, get_interpreter
+from ..helpers import active_view, get_interpreter, project_name
 
 
 class Market(object, metaclass=Repr):
     """When you need a worker you hire one in the market
     """
 
+    _instance = None
     _worker_pool = {}
-    _lock = threading.RLock()
+    _shared_pool = {}
+    _worker_windows = {}
     _workers_type = {'tcp': RemoteWorker, 'vagrant': VagrantWorker}
 
-    def hire(self):
+    def __new__(cls):
+        """There is only one market, every call returns the same instance
+        """
+
+        if cls._instance is None:
+            cls._instance = super(Market, cls).__new__(cls)
+
+        return cls._instance
+
+    def hire(self, view=None):
         """Hire the right worker from the market pool
         """
 
-        raw_interpreter = get_interpreter(active_view())
+        if view is None:
+            view = active_view()
+
+        # a new worker must never be built from stale cached settings
+        invalidate_build_settings()
+        raw_interpreter = get_interpreter(view)
         itprt = Interpreter(raw_interpreter)
         return self._workers_type.get(itprt.scheme, LocalWorker)(itprt)
 
+    def hire_shared(self, view=None):
+        """Hire a worker sharing it between windows with the same configuration
+
+        Windows that use the same interpreter, project and paths share one
+        worker (and so one JsonServer process and connection), requests are
+        routed back to the right callback using their uid
+        """
+
+        hired = self.hire(view)
+        key = hired.interpreter.key
+        worker = self._shared_pool.setdefault(key, hired)
+        if worker is hired:
+            return hired
+
+        if worker.interpreter.key != key or \
+                worker.status == WorkerStatus.quiting:
+            # the shared worker switched its interpreter or it has been fired
+            self._shared_pool[key] = hired
+            return hired
+
+        hired.dispose()
+        return worker
+
     def add(self, window_id, worker):
         """Add the given worker into the workers pool
         """
 
-        with self._lock:
-            if self._worker_pool.get(window_id) is None:
-                self._worker_pool[window_id] = worker
-            else:
-                Log.warning(
-                    'tried to append an existent worker for window {} to '
-                    'the workers market. Skipping...'.format(window_id)
-                )
+        if self._worker_pool.setdefault(window_id, worker) is not worker:
+            Log.warning(
+                'tried to append an existent worker for window {} to '
+                'the workers market. Skipping...'.format(window_id)
+            )
+            return
+
+        self._worker_windows.setdefault(worker, set()).add(window_id)
 
     def get(self, window_id):
         """Retrieve a worker for the given window_id from the workers market
-        """
 
-        with self._lock:
-            worker = self._worker_pool.get(window_id)
+        Dictionary lookups are atomic so there is no need to lock here
+        """
 
-        return worker
+        return self._worker_pool.get(window_id)
 
     def fire(self, window_id):
         """Remote a worker from the workers market
@@ -66,53 +102,126 @@ class Market(object, metaclass=Repr):
             )
             return
 
-    @classmethod
-    def execute(cls, callback, **data):
+        if not self._leave(window_id, worker):
+            # nobody uses it anymore, don't offer it to other windows
+            self._withdraw(worker)
+
+    def execute(self, callback, **data):
         """Execute the given method remotely and call the callback with result
         """
 
-        def _start_worker(wk, cb, **d):
-            wk.start()
+        def _start_worker(wk):
+            # use the requesting window, not the active one when this runs
+            if wk.client is None or not wk.client.connected:
+                wk.start(window, view)
+
             if wk.status == WorkerStatus.healthy:
-                wk._execute(cb, **d)
+                wk.flush_pending(view)
                 return
 
-            sublime.set_timeout_async(lambda: _start_worker(wk, cb, **d), 5000)
+            # only this chain restarts the worker, backing off on failures
+            wk.drop_pending()
+            delay = int(wk.restart_delay() * 1000)
+            sublime.set_timeout_async(lambda: _start_worker(wk), delay)
 
-        window_id = sublime.active_window().id()
-        worker = cls.get(cls, window_id)
+        window = sublime.active_window()
+        window_id, view = window.id(), window.active_view()
+        worker = self.get(window_id)
         if worker is None:
-            # hire a new worker
-            worker = cls.hire(cls)
-            cls.add(cls, window_id, worker)
+            # setdefault is atomic, if other thread won the race use its worker
+            hired = self.hire_shared(view)
+            worker = self._worker_pool.setdefault(window_id, hired)
+            if worker is hired:
+                self._worker_windows.setdefault(hired, set()).add(window_id)
+            elif hired.client is None and not self._worker_windows.get(hired):
+                # nobody else picked it from the shared pool, let it go
+                self._withdraw(hired)
+                hired.dispose()
+        elif len(self._worker_windows.get(worker, ())) > 1 and \
+                not self._matches(worker, window, view):
+            # this window configuration changed but other windows still use
+            # the shared worker, so move this window instead of switching it
+            hired = self.hire_shared(view)
+            self._leave(window_id, worker)
+            self._worker_pool[window_id] = worker = hired
+            self._worker_windows.setdefault(worker, set()).add(window_id)
 
         if worker.status == WorkerStatus.faulty:
             return
 
         if worker.status == WorkerStatus.quiting:
-            cls.fire(cls, window_id)
+            self.fire(window_id)
             return
 
-        if worker.client is not None:
-            if not worker.client.connected:
-                worker.reconnecting = True
-                worker.state = WorkerStatus.incomplete
-                _start_worker(worker, callback, **data)
-            else:
-                worker._append_context_data(data)
-                worker._execute(callback, **data)
-                if worker.status == WorkerStatus.quiting:
-                    # that means that we need to let the worker go
-                    cls.fire(cls, window_id)
-        else:
-            _start_worker(worker, callback, **data)
+        worker._append_context_data(data, view)
+        connected = worker.client is not None and worker.client.connected
+        if connected and not worker.starting:
+            # queued commands go first, don't overtake them while flushing
+            worker._execute(callback, view=view, **data)
+            if worker.status == WorkerStatus.quiting:
+                # that means that we need to let the worker go
+                self.fire(window_id)
+            return
 
-    @classmethod
-    def lookup(cls, window_id):
+        if not worker.queue_command(callback, data):
+            # the worker is being started already, it will run it later
+            return
+
+        if worker.client is not None and not worker.client.connected:
+            # the connection was lost, start the worker again
+            worker.reconnecting = True
+            worker.status = WorkerStatus.incomplete
+
+        # never block the caller (usually the UI thread) starting workers
+        sublime.set_timeout_async(lambda: _start_worker(worker), 0)
+
+    def _leave(self, window_id, worker):
+        """Forget that the given window uses the worker
+
+        Returns True if other windows still use it
+        """
+
+        windows = self._worker_windows.get(worker)
+        if windows is None:
+            return False
+
+        windows.discard(window_id)
+        if windows:
+            return True
+
+        self._worker_windows.pop(worker, None)
+        return False
+
+    def _withdraw(self, worker):
+        """Stop offering the given worker to other windows
+        """
+
+        for key, shared in list(self._shared_pool.items()):
+            if shared is worker:
+                self._shared_pool.pop(key, None)
+
+    def _matches(self, worker, window, view):
+        """Return True if the view configuration matches the given worker
+
+        It compares the same data that Interpreter.key is built from, the
+        paths come from the cached jsonserver build settings
+        """
+
+        interpreter = worker.interpreter
+        if get_interpreter(view) != interpreter.raw_interpreter or \
+                project_name() != interpreter.project_name:
+            return False
+
+        if not interpreter.for_local:
+            return True
+
+        return build_paths(window, view) == list(interpreter.paths or ())
+
+    def lookup(self, window_id):
         """Alias for get
         """
 
-        return cls.get(cls, window_id)
+        return self.get(window_id)
 
     @classmethod
     def _repr(cls):
@@ -12,6 +12,9 @@ class RemoteWorker(Worker):
     """This class implements a remote worker
     """
 
+    # remote minservers can be older than this plugin, just connect to them
+    check_request = False
+
     def __init__(self, interpreter):
         self.reconnecting = False
         super(RemoteWorker, self).__init__(interpreter)
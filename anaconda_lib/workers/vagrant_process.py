@@ -3,15 +3,18 @@
 # This program is Free Software see LICENSE file for details
 
 import os
-import time
 import shlex
 import socket
+import threading
 import subprocess
 
 from ..logger import Log
 from ..helpers import create_subprocess
 from ..helpers import debug_enabled, active_view, get_settings
 
+# seconds that we give to `vagrant ssh` to fail before we consider it running
+STARTUP_GRACE = 1
+
 
 class VagrantProcess(object):
     """Starts a new instance of the minserver into a vagrant guest
@@ -48,8 +51,15 @@ class VagrantProcess(object):
 
         args, kwargs = self._prepare_arguments()
         self._process = create_subprocess(args, **kwargs)
-        time.sleep(1)  # give it some time
-        if self._process is None or self._process.poll() is not None:
+        if self._process is None:
+            self.error = (
+                'Anaconda can not spawn the `vagrant` application to run '
+                '`{}`'.format(' '.join(args))
+            )
+            self.tip = 'Check your vagrant installation/configuration'
+            return False
+
+        if self._exited_within(STARTUP_GRACE):
             # we can't spawn the vagrant command. Not installed? Running?
             output, error = self._process.communicate()
             if error == b'Connection to 127.0.0.1 closed.\r\n':
@@ -67,19 +77,44 @@ class VagrantProcess(object):
 
         return True
 
+    def _exited_within(self, timeout):
+        """Return True if the vagrant process exits before the timeout
+
+        The calling thread is parked on an event that a waiter thread sets
+        as soon as the process exits, so we don't need to sleep blindly
+        """
+
+        exited = threading.Event()
+        process = self._process
+
+        def _wait():
+            process.wait()
+            exited.set()
+
+        threading.Thread(target=_wait, daemon=True).start()
+        return exited.wait(timeout)
+
     def _up_already(self):
         """Return True if the minserver is running already on guest
         """
 
         try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.settimeout(0.5)
-            s.connect((self.interpreter.host, self.interpreter.port))
-            s.close()
-            self.interpreter.manual = True
-        except:
+            address = (self.interpreter.host, int(self.interpreter.port))
+        except (TypeError, ValueError) as error:
+            Log.debug('invalid minserver port: {}'.format(error))
+            return False
+
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+                s.settimeout(0.5)
+                s.connect(address)
+        except (socket.timeout, socket.error) as error:
+            Log.debug('minserver is not running in the guest: {}'.format(
+                error
+            ))
             return False
 
+        self.interpreter.manual = True
         return True
 
     def _prepare_arguments(self):
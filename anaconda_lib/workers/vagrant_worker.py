@@ -19,22 +19,32 @@ class VagrantWorker(Worker):
     minserver in a local vagrant guest VM
     """
 
+    # the guest can be running a minserver older than this plugin, that
+    # we reuse when it is up already, so just connect to it
+    check_request = False
+
     def __init__(self, interpreter):
         super(VagrantWorker, self).__init__(interpreter)
+        self.start_declined = False
 
-    def start(self):
+    def start(self, window=None, view=None):
         """Start the vagrant worker
         """
 
-        if not self.check_config():
+        if not self.check_config(window):
+            # don't queue more commands for us until a retry succeeds
+            self.status = WorkerStatus.faulty
             return False
 
-        return super(VagrantWorker, self).start()
+        return super(VagrantWorker, self).start(window, view)
 
-    def check_config(self):
+    def check_config(self, window=None):
         """Check the configuration looks fine
         """
 
+        if window is None:
+            window = sublime.active_window()
+
         if self.interpreter.network is None:
             self.interpreter.network = 'forwarded'
 
@@ -65,6 +75,9 @@ class VagrantWorker(Worker):
             self.error = 'vagrant machine {} is not running'.format(
                 self.interpreter.machine)
             self.tip = 'Start the vagrant machine'
+            if self.start_declined:
+                # the user said no already, wait until the VM is started
+                return False
 
             start_now = sublime.ok_cancel_dialog(
                 '{} virtual machine is not running, do you want to start it '
@@ -72,7 +85,7 @@ class VagrantWorker(Worker):
                     self.interpreter.machine), 'Start Now'
             )
             if start_now:
-                sublime.active_window().run_command(
+                window.run_command(
                     'show_panel', {'panel': 'console', 'toggle': False})
                 try:
                     messages = {
@@ -99,6 +112,8 @@ class VagrantWorker(Worker):
                     ))
                     return self.check()
 
+            # don't ask again every time that the worker retries to start
+            self.start_declined = True
             return False
 
         return True
@@ -2,8 +2,11 @@
 # Copyright (C) 2013 - 2016 - Oscar Campos <oscar.campos@member.fsf.org>
 # This program is Free Software see LICENSE file for details
 
+import json
 import errno
 import socket
+import threading
+from collections import deque
 
 import sublime
 
@@ -15,18 +18,36 @@ from ..decorators import auto_project_switch_ng
 from ..helpers import debug_enabled, active_view, is_remote_session
 
 from .process import WorkerProcess
-from .interpreter import Interpreter
+from .interpreter import Interpreter, invalidate_build_settings
+
+# seconds to wait before retrying a failed start, doubled on every failure
+RESTART_BACKOFF = 5
+MAX_RESTART_BACKOFF = 30
+
+# commands queued while a worker starts, older ones are dropped when full
+MAX_PENDING_COMMANDS = 32
+
+# request sent to the JsonServer to make sure that it answers
+CHECK_REQUEST = b'{"method": "check", "uid": "status"}\r\n'
 
 
 class Worker(object):
     """Base class for workers
     """
 
+    # send a check request through the probe socket, not only connect
+    check_request = True
+
     def __init__(self, interpreter):
         self.status = WorkerStatus.incomplete
         self.interpreter = interpreter
         self.process = WorkerProcess(interpreter).take()
         self.client = None
+        self._addr = None
+        self._pending = deque(maxlen=MAX_PENDING_COMMANDS)
+        self._pending_lock = threading.Lock()
+        self._starting = False
+        self._backoff = RESTART_BACKOFF
 
     @property
     def unix_socket(self):
@@ -36,11 +57,16 @@ class Worker(object):
         for_local = self.interpreter.for_local
         return for_local and sublime.platform() == 'linux'
 
-    def start(self):
-        """Start the worker
+    def start(self, window=None, view=None):
+        """Start the worker for the given window (the active one by default)
         """
 
-        if not debug_enabled(active_view()):
+        if window is None:
+            window = sublime.active_window()
+        if view is None:
+            view = window.active_view()
+
+        if not debug_enabled(view):
             if self.process is None:
                 Log.fatal('Worker process is None!!')
                 return
@@ -55,7 +81,7 @@ class Worker(object):
                 Log.error(msg)
                 if self.status != WorkerStatus.faulty:
                     if not get_settings(
-                            active_view(), 'swallow_startup_errors', False):
+                            view, 'swallow_startup_errors', False):
                         sublime.error_message(msg)
                     self.status = WorkerStatus.faulty
                 return
@@ -70,16 +96,19 @@ class Worker(object):
             Log.error(msg)
             if self.status != WorkerStatus.faulty:
                 if not get_settings(
-                        active_view(), 'swallow_startup_errors', False):
+                        view, 'swallow_startup_errors', False):
                     sublime.error_message(msg)
                 self.status = WorkerStatus.faulty
             return
 
-        host, port = self.interpreter.host, self.interpreter.port
         if self.unix_socket:
-            port = 0
-        self.client = AsynClient(int(port), host=host)
+            host, port = self.interpreter.host, 0
+        else:
+            host, port = self._service_address()
+        # status first, other threads use the client as soon as it is set
         self.status = WorkerStatus.healthy
+        self.client = AsynClient(int(port), host=host)
+        self._backoff = RESTART_BACKOFF
         if hasattr(self, 'reconnecting') and self.reconnecting:
             self.reconnecting = False
 
@@ -88,6 +117,14 @@ class Worker(object):
         """
         pass
 
+    def dispose(self):
+        """Release the resources of a worker that is never going to be used
+        """
+
+        listen_socket = self.interpreter.release_listen_socket()
+        if listen_socket is not None:
+            listen_socket.close()
+
     def check(self):
         """This method must be re-implemented in base classes
         """
@@ -98,11 +135,74 @@ class Worker(object):
         """Renew the interpreter object (as it has changed in the configuration)
         """
 
+        invalidate_build_settings()
         self.interpreter = Interpreter(raw_interpreter)
         self.process.interpreter = self.interpreter
+        self.invalidate_address()
+
+    @property
+    def starting(self):
+        """True while the worker is starting and commands are being queued
+        """
+
+        return self._starting
+
+    def queue_command(self, callback, data):
+        """Queue a command to be executed once the worker is started
+
+        Returns True if the caller is the one that has to start the worker
+        """
+
+        with self._pending_lock:
+            self._pending.append((callback, data))
+            if self._starting:
+                return False
+
+            self._starting = True
+            return True
+
+    def restart_delay(self):
+        """Return the seconds to wait before retrying a failed start
+        """
+
+        delay = self._backoff
+        self._backoff = min(delay * 2, MAX_RESTART_BACKOFF)
+        return delay
+
+    def drop_pending(self):
+        """Forget the commands queued during a failed start
+
+        They would be stale by the time a later retry succeeds, we keep
+        starting set as the retries go on so only one chain restarts us
+        """
+
+        with self._pending_lock:
+            self._pending.clear()
+
+    def flush_pending(self, view=None):
+        """Execute every command that was queued while we were starting
+
+        Commands keep being queued until the queue is drained so new ones
+        never overtake the ones that were queued before them
+        """
+
+        self._backoff = RESTART_BACKOFF
+        while True:
+            with self._pending_lock:
+                if not self._pending:
+                    self._starting = False
+                    return
+
+                callback, data = self._pending.popleft()
+
+            try:
+                self._execute(callback, view=view, **data)
+            except Exception as error:
+                # never leave the worker starting forever because of one
+                Log.error('while executing a queued command: {}'.format(error))
 
     @auto_project_switch_ng
-    def _execute(self, callback, **data):
+    def _execute(self, callback, view=None, **data):
         """Execute the given method in the remote server
         """
 
@@ -113,24 +213,57 @@ class Worker(object):
         """
 
         s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
         s.settimeout(timeout)
-        s.connect((self.interpreter.host, int(self.interpreter.port)))
+        try:
+            s.connect(self._service_address())
+        except socket.error:
+            s.close()
+            raise
+
         return s
 
+    def _service_address(self):
+        """Return the resolved TCP address of the JsonServer
+
+        It is resolved only once and reused for every probe and connection
+        """
+
+        if self._addr is None:
+            self._addr = socket.getaddrinfo(
+                self.interpreter.host, int(self.interpreter.port),
+                socket.AF_INET, socket.SOCK_STREAM
+            )[0][4]
+
+        return self._addr
+
+    def invalidate_address(self):
+        """Forget the resolved JsonServer address
+        """
+
+        self._addr = None
+
     def _get_service_unix_socket(self, timeout=0.05):
         """Helper function that returns a unix socket to JsonServer process
         """
 
         s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
         s.settimeout(timeout)
-        s.connect(self.interpreter.host)
+        try:
+            s.connect(self.interpreter.host)
+        except socket.error:
+            s.close()
+            raise
+
         return s
 
-    def _append_context_data(self, data):
+    def _append_context_data(self, data, view=None):
         """Append contextual data depending on the worker type
         """
 
-        view = active_view()
+        if view is None:
+            view = active_view()
+
         if is_remote_session(view):
             directory_map = self.interpreter.pathmap
             if directory_map is None:
@@ -147,6 +280,19 @@ class Worker(object):
         """Check the socket status, return True if it is operable
         """
 
+        if not self._probe(timeout):
+            return False
+
+        self.error = False
+        return True
+
+    def _probe(self, timeout):
+        """Probe the JsonServer using a single connection
+
+        Returns True if it answers to the check request, otherwise
+        self.error is set with the reason why it is not healthy
+        """
+
         service_func = {
             True: self._get_service_unix_socket,
             False: self._get_service_socket
@@ -154,8 +300,6 @@ class Worker(object):
 
         try:
             s = service_func[self.unix_socket](timeout)
-            s.close()
-            self.error = False
         except socket.timeout:
             self.error = 'connection to {}:{} timed out after {}s'.format(
                 self.interpreter.host, self.interpreter.port, timeout
@@ -175,4 +319,48 @@ class Worker(object):
                 self.error = 'unexpected exception: {}'.format(error)
             return False
 
+        with s:
+            if not self.check_request:
+                return True
+
+            try:
+                s.sendall(CHECK_REQUEST)
+                reply = b''
+                while not reply.endswith(b'\r\n'):
+                    data = s.recv(1024)
+                    if not data:
+                        break
+                    reply += data
+            except socket.timeout:
+                self.error = (
+                    'the JsonServer accepted the connection but did not '
+                    'answer to the check request in {}s'.format(timeout)
+                )
+                return False
+            except socket.error as error:
+                self.error = (
+                    'the JsonServer accepted the connection but failed while '
+                    'answering to the check request: {}'.format(error)
+                )
+                return False
+
+        if not reply.endswith(b'\r\n'):
+            self.error = (
+                'the JsonServer closed the connection without answering to '
+                'the check request'
+            )
+            return False
+
+        try:
+            healthy = json.loads(reply.decode('utf8'))['message'] == 'Ok'
+        except (ValueError, KeyError, TypeError):
+            healthy = False
+
+        if not healthy:
+            self.error = (
+                'the JsonServer sent an invalid answer to the check '
+                'request: {}'.format(reply.strip())
+            )
+            return False
+
         return True
@@ -59,7 +59,6 @@ class JSONHandler(asynchat.async_chat):
         """
 
         if data is not None:
-            print(data)
             data = '{0}\r\n'.format(json.dumps(data))
             data = bytes(data, 'utf8') if PY3 else data
 
@@ -88,7 +87,7 @@ class JSONHandler(asynchat.async_chat):
 
             if data['method'] == 'check':
                 logging.info('Check received')
-                self.return_back(message='Ok', uid=data['uid'])
+                self.return_back({'message': 'Ok', 'uid': data['uid']})
                 return
 
             self.server.last_call = time.time()
@@ -152,20 +151,25 @@ class JSONServer(asyncore.dispatcher):
         address_family = socket.AF_UNIX
     socket_type = socket.SOCK_STREAM
 
-    def __init__(self, address, handler=JSONHandler):
+    def __init__(self, address, handler=JSONHandler, sock=None):
         self.address = address
         self.handler = handler
 
         asyncore.dispatcher.__init__(self)
-        self.create_socket(self.address_family, self.socket_type)
         self.last_call = time.time()
 
-        self.bind(self.address)
-        if hasattr(socket, 'AF_UNIX') and \
-                self.address_family == socket.AF_UNIX:
-            # WSL 1903 fix
-            chmod(self.address, xor(0o777, get_current_umask()))
-        logging.debug('bind: address=%s' % (address,))
+        if sock is not None:
+            # our parent did bind the socket already for us
+            sock.setblocking(0)
+            self.set_socket(sock)
+        else:
+            self.create_socket(self.address_family, self.socket_type)
+            self.bind(self.address)
+            if hasattr(socket, 'AF_UNIX') and \
+                    self.address_family == socket.AF_UNIX:
+                # WSL 1903 fix
+                chmod(self.address, xor(0o777, get_current_umask()))
+            logging.debug('bind: address=%s' % (address,))
         self.listen(self.request_queue_size)
         logging.debug('listen: backlog=%d' % (self.request_queue_size,))
 
@@ -311,6 +315,16 @@ if __name__ == "__main__":
         help='extra paths (separed by comma) that should be added to sys.paths'
     )
 
+    opt_parser.add_option(
+        '-r', '--ready-fd', action='store', dest='ready_fd', type='int',
+        help='file descriptor to notify when the server is ready to accept'
+    )
+
+    opt_parser.add_option(
+        '-f', '--listen-fd', action='store', dest='listen_fd', type='int',
+        help='file descriptor of an already bound socket to listen on'
+    )
+
     options, args = opt_parser.parse_args()
     port, PID = None, None
     if not LINUX:
@@ -344,7 +358,13 @@ if __name__ == "__main__":
     try:
         server = None
         if not LINUX:
-            server = JSONServer(('localhost', port))
+            sock = None
+            if options.listen_fd is not None:
+                sock = socket.fromfd(
+                    options.listen_fd, socket.AF_INET, socket.SOCK_STREAM
+                )
+                os.close(options.listen_fd)
+            server = JSONServer(('localhost', port), sock=sock)
         else:
             unix_socket_path = UnixSocketPath(options.project)
             if not os.path.exists(dirname(unix_socket_path.socket)):
@@ -372,6 +392,11 @@ if __name__ == "__main__":
 
     server.logger = logger
 
+    # notify our parent that we are listening already
+    if options.ready_fd is not None:
+        os.write(options.ready_fd, b'1')
+        os.close(options.ready_fd)
+
     # start PID checker thread
     if PID != 'DEBUG':
         checker = Checker(server, pid=PID, delta=1)
@@ -77,7 +77,7 @@ class JSONHandler(asynchat.async_chat):
                 return
 
             if data['method'] == 'check':
-                self.return_back(message='Ok', uid=data['uid'])
+                self.return_back({'message': 'Ok', 'uid': data['uid']})
                 return
 
             self.server.last_call = time.time()
@@ -6,7 +6,6 @@ import sublime
 import sublime_plugin
 
 from ..anaconda_lib.worker import Worker
-from ..anaconda_lib.workers.market import Market
 from ..anaconda_lib.helpers import is_remote_session
 from ..anaconda_lib.explore_panel import ExplorerPanel
 from ..anaconda_lib.helpers import prepare_send_data, is_python, get_settings
@@ -65,7 +64,7 @@ class AnacondaGoto(sublime_plugin.TextCommand):
         if is_remote_session(self.view):
             window = self.view.window().id()
             try:
-                interpreter = Market().get(window).interpreter
+                interpreter = Worker().get(window).interpreter
             except Exception as e:
                 print('while getting interp for Window ID {}: {}'.format(
                     window, e)